@@ -1,98 +1,8 @@
 # app.py — Version 100% SQLite (compatible Streamlit Cloud)
 import streamlit as st
 import random
-import json
-import sqlite3
-from typing import Dict, Optional
-
-# =========================
-# Base de données (SQLite)
-# =========================
-def get_conn():
-    # check_same_thread=False pour usage dans Streamlit
-    return sqlite3.connect("sauvegarde.db", check_same_thread=False)
-
-def db_init():
-    conn = get_conn()
-    cur = conn.cursor()
-    # Table des utilisateurs avec toutes les colonnes nécessaires
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        name TEXT PRIMARY KEY,
-        points INTEGER NOT NULL DEFAULT 0,
-        consumables TEXT NOT NULL DEFAULT '{}',      -- JSON dict
-        has_hat INTEGER NOT NULL DEFAULT 0,          -- 0/1
-        inventory_list TEXT NOT NULL DEFAULT '[]',   -- JSON list
-        achievements TEXT NOT NULL DEFAULT '[]',     -- JSON list
-        pet TEXT NOT NULL DEFAULT 'none',
-        pet_xp INTEGER NOT NULL DEFAULT 0
-    )
-    """)
-    conn.commit()
-    conn.close()
-
-def db_get_user(name: str) -> Optional[Dict]:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT name, points, consumables, has_hat, inventory_list, achievements, pet, pet_xp
-        FROM users WHERE name=?
-    """, (name,))
-    row = cur.fetchone()
-    conn.close()
-    if not row:
-        return None
-    try:
-        return {
-            "name": row[0],
-            "points": int(row[1] or 0),
-            "consumables": json.loads(row[2] or "{}"),
-            "has_hat": bool(row[3]),
-            "inventory_list": json.loads(row[4] or "[]"),
-            "achievements": set(json.loads(row[5] or "[]")),
-            "pet": row[6] or "none",
-            "pet_xp": int(row[7] or 0),
-        }
-    except Exception:
-        # Si jamais mauvaise donnée, on revient à un état par défaut
-        return {
-            "name": name,
-            "points": 0,
-            "consumables": {},
-            "has_hat": False,
-            "inventory_list": [],
-            "achievements": set(),
-            "pet": "none",
-            "pet_xp": 0,
-        }
-
-def db_upsert_user(state: Dict):
-    # state attendu: keys name, points, consumables, has_hat, inventory_list, achievements, pet, pet_xp
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO users (name, points, consumables, has_hat, inventory_list, achievements, pet, pet_xp)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(name) DO UPDATE SET
-            points=excluded.points,
-            consumables=excluded.consumables,
-            has_hat=excluded.has_hat,
-            inventory_list=excluded.inventory_list,
-            achievements=excluded.achievements,
-            pet=excluded.pet,
-            pet_xp=excluded.pet_xp
-    """, (
-        state["name"],
-        int(state.get("points", 0)),
-        json.dumps(state.get("consumables", {})),
-        1 if state.get("has_hat", False) else 0,
-        json.dumps(state.get("inventory_list", [])),
-        json.dumps(list(state.get("achievements", []))),
-        state.get("pet", "none"),
-        int(state.get("pet_xp", 0)),
-    ))
-    conn.commit()
-    conn.close()
+from db import db_init, db_get_user, db_upsert_user, db_top_users, db_user_rank, db_stats, db_touch_user
+from game_logic import apply_win, evolve_pet, check_legend, mastermind_score, pendu_mask, pendu_guess
 
 # =========================
 # App config
@@ -132,9 +42,14 @@ def add_consumable(key, count=1):
 def consume_item(key):
     if st.session_state.consumables.get(key, 0) > 0:
         st.session_state.consumables[key] -= 1
+        record_stat("use", key)
         return True
     return False
 
+def record_stat(kind, key, amount=0):
+    # Enregistré en base avec la prochaine sauvegarde (même transaction)
+    st.session_state.pending_stats.append((kind, key, amount))
+
 def get_state_for_saving(name: str):
     return {
         "name": name,
@@ -149,51 +64,32 @@ def get_state_for_saving(name: str):
 
 def save_current_user():
     if "player_name" not in st.session_state or not st.session_state.player_name:
+        # Sans pseudo rien n'est sauvegardé : les statistiques en attente non plus
+        st.session_state.pending_stats = []
         return
-    db_upsert_user(get_state_for_saving(st.session_state.player_name))
+    db_upsert_user(get_state_for_saving(st.session_state.player_name), st.session_state.pending_stats)
+    st.session_state.pending_stats = []
 
 def evolve_pet_if_needed():
-    if st.session_state.pet == "egg" and st.session_state.pet_xp >= 10:
-        st.session_state.pet = "puppy"
-        st.session_state.achievements.add("Naissance du compagnon")
-        st.success("🐣 Ton œuf a éclos en chiot !")
-    elif st.session_state.pet == "puppy" and st.session_state.pet_xp >= 30:
-        st.session_state.pet = "adult"
-        st.session_state.achievements.add("Compagnon adulte")
-        st.success("🐶 Ton chiot est devenu adulte !")
-    elif st.session_state.pet == "adult" and st.session_state.pet_xp >= 100:
-        st.session_state.pet = "legend"
-        st.session_state.achievements.add("Compagnon légendaire")
-        st.success("👑 Ton compagnon est devenu légendaire !")
+    message = evolve_pet(st.session_state)
+    if message:
+        st.success(message)
     check_legend_success()
     save_current_user()
 
 def check_legend_success():
-    if (st.session_state.pet_xp >= 1000) and (not st.session_state.legend_awarded):
-        st.session_state.achievements.add("🏆 Légende vivante")
-        st.session_state.points += 20
-        st.session_state.legend_awarded = True
+    if check_legend(st.session_state):
         st.balloons()
         st.success("🏆 Succès débloqué : Légende vivante ! +20 points")
         save_current_user()
 
-def award_points(points_gain=0, reason=None):
-    bonus = 1 if st.session_state.has_hat else 0
-    total = points_gain + bonus
-    st.session_state.points += total
+def award_points(points_gain=0, reason=None, game=None):
+    total = apply_win(st.session_state, points_gain)
+    if game and points_gain > 0:
+        record_stat("win", game, total)
     if reason:
         st.success(f"+{total} points ({reason})")
-    if points_gain > 0:
-        st.session_state.total_wins += 1
-        st.session_state.consecutive_wins += 1
-    else:
-        st.session_state.consecutive_wins = 0
-    if st.session_state.total_wins >= 5:
-        st.session_state.achievements.add("Vainqueur x5")
-    if st.session_state.consecutive_wins >= 3:
-        st.session_state.achievements.add("Série de 3 victoires")
     if st.session_state.pet != "none":
-        st.session_state.pet_xp += points_gain
         evolve_pet_if_needed()
     if st.session_state.points >= 100:
         st.session_state.secret_unlocked = True
@@ -218,6 +114,7 @@ if "total_wins" not in st.session_state: st.session_state.total_wins = 0
 if "consecutive_wins" not in st.session_state: st.session_state.consecutive_wins = 0
 if "secret" not in st.session_state: st.session_state.secret = random.randint(1, 20)
 if "secret_unlocked" not in st.session_state: st.session_state.secret_unlocked = False
+if "pending_stats" not in st.session_state: st.session_state.pending_stats = []
 
 # Pendu
 if "mot_secret" not in st.session_state:
@@ -263,6 +160,7 @@ if player_name:
         # Charger depuis la DB si déjà existant, sinon créer une ligne avec l'état courant
         existing = db_get_user(player_name)
         if existing:
+            db_touch_user(player_name)
             st.session_state.points = existing["points"]
             st.session_state.consumables = existing["consumables"]
             st.session_state.has_hat = existing["has_hat"]
@@ -277,7 +175,7 @@ if player_name:
 else:
     st.sidebar.info("Entre un pseudo pour activer la sauvegarde.")
 
-tab = st.sidebar.selectbox("Navigation", ["Accueil", "Jeux internes", "Jeux externes", "Boutique", "Animal", "Succès"])
+tab = st.sidebar.selectbox("Navigation", ["Accueil", "Jeux internes", "Jeux externes", "Boutique", "Animal", "Succès", "Statistiques"])
 
 st.markdown(f"**💰 Points : {st.session_state.points} • Inventaire : {', '.join(inventory_display_list()) or 'Aucun'}**")
 
@@ -300,7 +198,7 @@ elif tab == "Jeux internes":
         guess = st.number_input("Entrez un nombre entre 1 et 20", min_value=1, max_value=20, step=1, key="guess_input")
         if st.button("Vérifier", key="btn_verify_guess"):
             if guess == st.session_state.secret:
-                award_points(5, "Devine le nombre gagné")
+                award_points(5, "Devine le nombre gagné", game)
                 st.session_state.secret = random.randint(1, 20)
                 save_current_user()
             elif guess < st.session_state.secret:
@@ -320,7 +218,7 @@ elif tab == "Jeux internes":
             elif (choix == "Pierre" and bot == "Ciseaux") or \
                  (choix == "Papier" and bot == "Pierre") or \
                  (choix == "Ciseaux" and bot == "Papier"):
-                award_points(2, "Chifoumi gagné")
+                award_points(2, "Chifoumi gagné", game)
                 save_current_user()
             else:
                 st.error("Perdu 😢")
@@ -337,7 +235,7 @@ elif tab == "Jeux internes":
             "+---+\nO   |\n/|\\ |\n/   |\n   ===",
             "+---+\nO   |\n/|\\ |\n/ \\ |\n   ==="
         ]
-        mot_affiche = " ".join([l if l in st.session_state.lettres_trouvees else "_" for l in st.session_state.mot_secret])
+        mot_affiche = pendu_mask(st.session_state.mot_secret, st.session_state.lettres_trouvees)
         st.write(f"Mot à deviner : **{mot_affiche}**")
         st.code(pendu_etapes[st.session_state.erreurs])
 
@@ -358,22 +256,21 @@ elif tab == "Jeux internes":
         lettre = st.text_input("Proposez une lettre :", max_chars=1, key="pendu_input")
         if st.button("Proposer la lettre"):
             l = (lettre or "").lower()
-            if not l or not l.isalpha():
+            resultat = pendu_guess(st.session_state.mot_secret, st.session_state.lettres_trouvees, l)
+            if resultat == "invalide":
                 st.warning("⚠️ Entrez une lettre valide.")
+            elif resultat == "deja":
+                st.warning("⚠️ Lettre déjà proposée.")
+            elif resultat == "trouvee":
+                st.success(f"✅ La lettre **{l}** est dans le mot !")
+                save_current_user()
             else:
-                if l in st.session_state.lettres_trouvees:
-                    st.warning("⚠️ Lettre déjà proposée.")
-                elif l in st.session_state.mot_secret:
-                    st.session_state.lettres_trouvees.append(l)
-                    st.success(f"✅ La lettre **{l}** est dans le mot !")
-                    save_current_user()
-                else:
-                    st.session_state.erreurs += 1
-                    st.error(f"❌ La lettre **{l}** n'est pas dans le mot.")
+                st.session_state.erreurs += 1
+                st.error(f"❌ La lettre **{l}** n'est pas dans le mot.")
 
         # Gagné
         if "_" not in mot_affiche:
-            award_points(3, "Pendu gagné")
+            award_points(3, "Pendu gagné", game)
             st.session_state.achievements.add("Maître du mot")
             st.session_state.mot_secret = random.choice(["python","famille","ordinateur","jeu","tom","arcade","chat","pizza","robot","streamlit"])
             st.session_state.lettres_trouvees = []
@@ -411,11 +308,10 @@ elif tab == "Jeux internes":
         couleurs = ["Rouge","Bleu","Vert","Jaune","Orange","Violet"]
         choix = [st.selectbox(f"Couleur {i+1}", couleurs, key=f"mm_color_{i}") for i in range(4)]
         if st.button("Vérifier combinaison"):
-            bien_places = sum([c == s for c, s in zip(choix, st.session_state.mastermind_secret)])
-            mal_places = sum(min(choix.count(c), st.session_state.mastermind_secret.count(c)) for c in couleurs) - bien_places
+            bien_places, mal_places = mastermind_score(choix, st.session_state.mastermind_secret)
             st.write(f"Bien placés : {bien_places} | Mal placés : {mal_places}")
             if bien_places == 4:
-                award_points(8, "Mastermind gagné")
+                award_points(8, "Mastermind gagné", game)
                 st.session_state.achievements.add("Maître du code")
                 st.session_state.mastermind_secret = [random.choice(couleurs) for _ in range(4)]
                 st.session_state.mastermind_attempts = 6
@@ -461,7 +357,7 @@ elif tab == "Jeux internes":
         proposition = st.text_input("Votre réponse :")
         if st.button("Valider"):
             if (proposition or "").lower() == st.session_state.mot_original:
-                award_points(5, "Mots mélangés gagné")
+                award_points(5, "Mots mélangés gagné", game)
                 st.session_state.achievements.add("Décodeur")
                 mots = ["python","streamlit","ordinateur","arcade","programmation","robot"]
                 st.session_state.mot_original = random.choice(mots)
@@ -512,7 +408,7 @@ elif tab == "Jeux internes":
             y = st.slider("Choisis Y", 0, 3, 0, key="tre_y_internal")
             if st.button("Creuser"):
                 if (x,y) == st.session_state.treasure_pos:
-                    award_points(20, "Trésor trouvé")
+                    award_points(20, "Trésor trouvé", game)
                     st.success("💎 Tu as trouvé le trésor !")
                     st.session_state.treasure_pos = (random.randint(0,3), random.randint(0,3))
                     st.session_state.treasure_attempts = 6
@@ -570,6 +466,7 @@ elif tab == "Boutique":
                     if st.button("Acheter", key="buy_pet"):
                         if st.session_state.points >= art["prix"]:
                             st.session_state.points -= art["prix"]
+                            record_stat("purchase", art["key"], art["prix"])
                             st.session_state.pet = "egg"
                             if art["nom"] not in st.session_state.inventory_list:
                                 st.session_state.inventory_list.append(art["nom"])
@@ -584,6 +481,7 @@ elif tab == "Boutique":
                     if st.button("Acheter", key="buy_hat"):
                         if st.session_state.points >= art["prix"]:
                             st.session_state.points -= art["prix"]
+                            record_stat("purchase", art["key"], art["prix"])
                             st.session_state.has_hat = True
                             if art["nom"] not in st.session_state.inventory_list:
                                 st.session_state.inventory_list.append(art["nom"])
@@ -597,6 +495,7 @@ elif tab == "Boutique":
                 if st.button("Acheter", key=f"buy_{art['key']}"):
                     if st.session_state.points >= art["prix"]:
                         st.session_state.points -= art["prix"]
+                        record_stat("purchase", art["key"], art["prix"])
                         add_consumable(art["key"],1)
                         if art["nom"] not in st.session_state.inventory_list:
                             st.session_state.inventory_list.append(art["nom"])
@@ -648,24 +547,38 @@ elif tab == "Succès":
             st.write("•", a)
     else:
         st.write("Aucun succès débloqué pour le moment. Joue pour en obtenir !")
+
+elif tab == "Statistiques":
+    st.header("📊 Statistiques de l'économie")
+    days = st.selectbox("Période", [7, 30, 90, 365], index=1, format_func=lambda d: f"{d} derniers jours")
+    stats = db_stats(days)
+
+    st.subheader("🎮 Victoires par jeu")
+    if stats["games"]:
+        st.table([{"Jeu": g, "Victoires": w, "Points gagnés": p} for g, w, p in stats["games"]])
+    else:
+        st.write("Aucune victoire enregistrée sur la période.")
+
+    st.subheader("🛒 Boutique et consommables")
+    if stats["items"]:
+        st.table([{"Article": i, "Achats": n, "Points dépensés": p, "Utilisés": u} for i, n, p, u in stats["items"]])
+    else:
+        st.write("Aucun achat ni consommable utilisé sur la période.")
+
+    st.subheader("🐶 Stades des compagnons")
+    st.table([{"Stade": s, "Joueurs": n} for s, n in stats["pets"]])
+
+    st.subheader("📅 Points par jour")
+    if stats["days"]:
+        st.table([{"Jour": d, "Victoires": w, "Points gagnés": p, "Points dépensés": s} for d, w, p, s in stats["days"]])
 # ---------------------------
 # PAGE: CLASSEMENT
 # ---------------------------
 elif tab == "Classement":
     st.header("🏆 Classement des joueurs")
 
-    conn = sqlite3.connect("sauvegarde.db")
-    cur = conn.cursor()
-
     # Récupérer le top 20
-    cur.execute("""
-        SELECT joueur, MAX(points) as pts
-        FROM sauvegarde
-        GROUP BY joueur
-        ORDER BY pts DESC
-        LIMIT 20
-    """)
-    rows = cur.fetchall()
+    rows = db_top_users(20)
     top_names = [r[0] for r in rows]
 
     # Trouver le score maximum (évite division par zéro)
@@ -686,17 +599,8 @@ elif tab == "Classement":
     # Afficher la position du joueur connecté
     me_name = st.session_state.get("player_name", None)
     if me_name:
-        save_current_user_sqlite()
-        cur.execute("SELECT points FROM sauvegarde WHERE joueur = ?", (me_name,))
-        me_row = cur.fetchone()
-        if me_row:
-            me_points = me_row[0]
-            cur.execute("SELECT COUNT(*) + 1 FROM sauvegarde WHERE points > ?", (me_points,))
-            me_rank = cur.fetchone()[0]
-        else:
-            cur.execute("INSERT INTO sauvegarde (joueur, points) VALUES (?, 0)", (me_name,))
-            conn.commit()
-            me_points, me_rank = 0, None
+        save_current_user()
+        me_points, me_rank = db_user_rank(me_name) or (0, None)
 
         if me_name not in top_names:
             st.markdown("---")
@@ -708,8 +612,6 @@ elif tab == "Classement":
                 st.progress(0)
             st.write(f"{me_badge} **{me_name}** — {me_points} points")
 
-    conn.close()
-
 
 # =========================
 # Footer
@@ -0,0 +1,264 @@
+# bench.py — Micro-benchmarks de la couche DB et des jeux, avec comparaison de baselines
+#
+#   python bench.py run [--out bench_baseline.json] [--tailles 1000,100000,1000000]
+#   python bench.py run --compare bench_baseline.json --seuil 0.25
+#   python bench.py compare bench_baseline.json bench_courant.json [--seuil 0.2] [--seuil-cas nom=0.5]
+#
+# Tout tourne sur une base SQLite temporaire remplie de données synthétiques (graine fixe) :
+# la vraie sauvegarde.db n'est jamais touchée.
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone
+
+import db
+from game_logic import COULEURS, apply_win, evolve_pet, check_legend, mastermind_score, pendu_mask, pendu_guess
+
+SEED = 1234
+TAILLES_DEFAUT = [1_000, 100_000, 1_000_000]
+MOTS_PENDU = ["python","famille","ordinateur","jeu","tom","arcade","chat","pizza","robot","streamlit"]
+SHOP_NOMS = ["🥚 Œuf de compagnon", "🎩 Chapeau magique", "💡 Indice Pendu", "🎯 Aide Mastermind", "🔄 Rejouer", "🚀 Boost Animal"]
+
+# =========================
+# Données synthétiques
+# =========================
+def make_state(rng: random.Random, name: str, large: bool = False):
+    # Petit profil : quelques objets ; grand profil : inventaire et succès volumineux
+    n_items = 500 if large else 2
+    n_succes = 200 if large else 3
+    return {
+        "name": name,
+        "points": rng.randint(0, 5000),
+        "consumables": {k: rng.randint(0, 9) for k in ["indice_pendu", "aide_mastermind", "rejouer", "boost_animal"]},
+        "has_hat": rng.random() < 0.5,
+        "inventory_list": [f"{rng.choice(SHOP_NOMS)} #{i}" for i in range(n_items)],
+        "achievements": {f"Succès {i}" for i in range(n_succes)},
+        "pet": rng.choice(["none", "egg", "puppy", "adult", "legend"]),
+        "pet_xp": rng.randint(0, 1500),
+    }
+
+def seed_users(n: int, rng: random.Random):
+    # Insertion en masse dans une seule transaction (bien plus rapide que db_upsert_user en boucle)
+    db.db_init()
+    conn = db.get_conn()
+    rows = ((f"joueur_{i}", rng.randint(0, 100_000), rng.choice(["none", "egg", "puppy", "adult", "legend"]), rng.randint(0, 1500))
+            for i in range(n))
+    conn.executemany("INSERT INTO users (name, points, pet, pet_xp) VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+def seed_states(etats):
+    # Mêmes colonnes et sérialisation que db_upsert_user, en une seule transaction
+    conn = db.get_conn()
+    conn.executemany("""
+        INSERT OR REPLACE INTO users (name, points, consumables, has_hat, inventory_list, achievements, pet, pet_xp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(e["name"], e["points"], json.dumps(e["consumables"]), 1 if e["has_hat"] else 0,
+           json.dumps(e["inventory_list"]), json.dumps(list(e["achievements"])), e["pet"], e["pet_xp"])
+          for e in etats])
+    conn.commit()
+    conn.close()
+
+def use_temp_db(dossier: str, nom: str):
+    db.DB_PATH = os.path.join(dossier, nom)
+    if os.path.exists(db.DB_PATH):
+        os.remove(db.DB_PATH)
+    db.db_init()
+
+# =========================
+# Mesure
+# =========================
+def mesurer(fn, repeat: int):
+    # autorange choisit un nombre d'itérations (>= 0.2 s), puis on répète la mesure
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    durees = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "median_us": statistics.median(durees) * 1e6,
+        "min_us": min(durees) * 1e6,
+        "iterations": number,
+        "repeat": repeat,
+    }
+
+def cas_db(dossier: str, rng: random.Random):
+    for taille in ("small", "large"):
+        use_temp_db(dossier, f"db_{taille}.db")
+        large = taille == "large"
+        seed_users(10_000, rng)
+        etats = [make_state(rng, f"joueur_{i}", large) for i in range(1_000)]
+        seed_states(etats)
+        noms = [e["name"] for e in etats]
+        cas = {}
+
+        # warm : toujours le même profil ; cold : un profil différent à chaque appel
+        cas[f"db_get_user_warm_{taille}"] = lambda n=noms[0]: db.db_get_user(n)
+        curseur = itertools.cycle(noms)
+        cas[f"db_get_user_cold_{taille}"] = lambda c=curseur: db.db_get_user(next(c))
+
+        # warm : mise à jour d'un profil existant ; cold : création d'un nouveau profil
+        cas[f"db_upsert_user_warm_{taille}"] = lambda e=etats[0]: db.db_upsert_user(e)
+        modele = make_state(rng, "modele", large)
+        compteur = itertools.count()
+        cas[f"db_upsert_user_cold_{taille}"] = lambda m=modele, c=compteur: db.db_upsert_user(dict(m, name=f"nouveau_{next(c)}"))
+
+        # Sauvegarde accompagnée des rollups d'une victoire, d'un achat et d'un consommable
+        events = [("win", "Mastermind", 8), ("purchase", "rejouer", 12), ("use", "rejouer", 0)]
+        cas[f"db_upsert_user_rollups_{taille}"] = lambda e=etats[0], ev=events: db.db_upsert_user(e, ev)
+        yield cas
+
+def cas_jeux(rng: random.Random):
+    cas = {}
+
+    # award_points : l'œuf est à 1 XP de l'éclosion, chaque appel déclenche une évolution puis sauvegarde
+    base = make_state(rng, "joueur_award")
+    base.update(pet="egg", pet_xp=9, total_wins=4, consecutive_wins=2, legend_awarded=False)
+    def award_points_evolution():
+        state = dict(base, achievements=set(base["achievements"]))
+        apply_win(state, 5)
+        evolve_pet(state)
+        check_legend(state)
+        db.db_upsert_user(state)
+    cas["award_points_evolution"] = award_points_evolution
+
+    combinaisons = itertools.cycle([([rng.choice(COULEURS) for _ in range(4)], [rng.choice(COULEURS) for _ in range(4)])
+                                    for _ in range(1_000)])
+    cas["mastermind_score"] = lambda: mastermind_score(*next(combinaisons))
+
+    propositions = itertools.cycle([(rng.choice(MOTS_PENDU), rng.choice("abcdefghijklmnopqrstuvwxyz")) for _ in range(1_000)])
+    def pendu_lettre():
+        mot, lettre = next(propositions)
+        lettres = []
+        pendu_guess(mot, lettres, lettre)
+        pendu_mask(mot, lettres)
+    cas["pendu_lettre"] = pendu_lettre
+    return cas
+
+def cas_classement(dossier: str, taille: int, rng: random.Random):
+    use_temp_db(dossier, f"classement_{taille}.db")
+    seed_users(taille, rng)
+    nom = f"joueur_{taille // 2}"
+    return {
+        f"leaderboard_top20_{taille}": lambda: db.db_top_users(20),
+        f"leaderboard_rank_{taille}": lambda: db.db_user_rank(nom),
+        f"stats_read_{taille}": lambda: db.db_stats(30),
+    }
+
+def run(tailles, repeat: int, filtre=None):
+    rng = random.Random(SEED)
+    resultats = {}
+
+    def executer(cas):
+        for nom, fn in cas.items():
+            if filtre and filtre not in nom:
+                continue
+            resultats[nom] = mesurer(fn, repeat)
+            print(f"{nom:40s} {resultats[nom]['median_us']:12.2f} µs")
+
+    ancien_chemin = db.DB_PATH
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_") as dossier:
+            for cas in cas_db(dossier, rng):
+                executer(cas)
+            use_temp_db(dossier, "jeux.db")
+            executer(cas_jeux(rng))
+            for taille in tailles:
+                executer(cas_classement(dossier, taille, rng))
+    finally:
+        db.DB_PATH = ancien_chemin
+
+    return {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": SEED,
+            "tailles": tailles,
+        },
+        "resultats": resultats,
+    }
+
+# =========================
+# Comparaison
+# =========================
+def compare(baseline, courant, seuil: float, seuils_cas=None) -> int:
+    # Renvoie le nombre de régressions (médiane courante > médiane baseline * (1 + seuil))
+    seuils_cas = seuils_cas or {}
+    regressions = 0
+    base_res, cour_res = baseline["resultats"], courant["resultats"]
+    for nom in sorted(set(base_res) | set(cour_res)):
+        if nom not in base_res or nom not in cour_res:
+            print(f"{nom:40s} {'absent de la baseline' if nom not in base_res else 'absent du run courant'}")
+            continue
+        avant, apres = base_res[nom]["median_us"], cour_res[nom]["median_us"]
+        ratio = apres / avant if avant else float("inf")
+        limite = seuils_cas.get(nom, seuil)
+        statut = "OK"
+        if ratio > 1 + limite:
+            statut = "REGRESSION"
+            regressions += 1
+        print(f"{nom:40s} {avant:12.2f} -> {apres:12.2f} µs  x{ratio:5.2f}  {statut}")
+    return regressions
+
+def parse_seuils_cas(valeurs):
+    seuils = {}
+    for v in valeurs or []:
+        nom, _, seuil = v.partition("=")
+        seuils[nom] = float(seuil)
+    return seuils
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de la couche DB et des jeux.")
+    sub = parser.add_subparsers(dest="commande", required=True)
+
+    p_run = sub.add_parser("run", help="Lancer les benchmarks et écrire les résultats en JSON")
+    p_run.add_argument("--out", default="bench_baseline.json")
+    p_run.add_argument("--tailles", default=",".join(str(t) for t in TAILLES_DEFAUT),
+                       help="Nombres d'utilisateurs pour le classement (séparés par des virgules)")
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("--filtre", help="Ne lancer que les cas dont le nom contient ce texte")
+    p_run.add_argument("--compare", metavar="BASELINE", help="Comparer directement à une baseline")
+
+    p_cmp = sub.add_parser("compare", help="Comparer deux fichiers de résultats")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("courant")
+
+    for p in (p_run, p_cmp):
+        p.add_argument("--seuil", type=float, default=0.20, help="Régression tolérée (0.20 = +20%%)")
+        p.add_argument("--seuil-cas", action="append", metavar="NOM=SEUIL", help="Seuil spécifique à un cas")
+
+    args = parser.parse_args(argv)
+
+    if args.commande == "run":
+        tailles = [int(t) for t in args.tailles.split(",") if t]
+        courant = run(tailles, args.repeat, args.filtre)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(courant, f, indent=2, ensure_ascii=False)
+        print(f"Résultats écrits dans {args.out}")
+        if not args.compare:
+            return 0
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.courant, encoding="utf-8") as f:
+            courant = json.load(f)
+
+    regressions = compare(baseline, courant, args.seuil, parse_seuils_cas(args.seuil_cas))
+    if regressions:
+        print(f"{regressions} régression(s) au-delà du seuil.")
+        return 1
+    print("Aucune régression.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+# db.py — Couche SQLite (sans dépendance à Streamlit)
+import os
+import json
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Chemin de la base : surchargeable par variable d'environnement (benchmarks, tests locaux)
+DB_PATH = os.environ.get("SAUVEGARDE_DB", "sauvegarde.db")
+# Profils inactifs déplacés hors de la base principale (voir db_archive_inactive)
+ARCHIVE_PATH = os.environ.get("SAUVEGARDE_ARCHIVE_DB", "archive.db")
+
+USER_COLUMNS = "name, points, consumables, has_hat, inventory_list, achievements, pet, pet_xp, last_seen"
+
+def get_conn():
+    # check_same_thread=False pour usage dans Streamlit
+    return sqlite3.connect(DB_PATH, check_same_thread=False)
+
+def db_init():
+    conn = get_conn()
+    cur = conn.cursor()
+    # auto_vacuum incrémental (permet PRAGMA incremental_vacuum) : un VACUUM complet une seule fois
+    cur.execute("PRAGMA auto_vacuum")
+    if cur.fetchone()[0] != 2:
+        cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        cur.execute("VACUUM")
+    # Table des utilisateurs avec toutes les colonnes nécessaires
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS users (
+        name TEXT PRIMARY KEY,
+        points INTEGER NOT NULL DEFAULT 0,
+        consumables TEXT NOT NULL DEFAULT '{}',      -- JSON dict
+        has_hat INTEGER NOT NULL DEFAULT 0,          -- 0/1
+        inventory_list TEXT NOT NULL DEFAULT '[]',   -- JSON list
+        achievements TEXT NOT NULL DEFAULT '[]',     -- JSON list
+        pet TEXT NOT NULL DEFAULT 'none',
+        pet_xp INTEGER NOT NULL DEFAULT 0,
+        last_seen INTEGER                            -- timestamp unix de la dernière visite
+    )
+    """)
+    # Migration des bases créées avant last_seen : les profils existants partent de maintenant
+    cur.execute("PRAGMA table_info(users)")
+    if "last_seen" not in [r[1] for r in cur.fetchall()]:
+        cur.execute("ALTER TABLE users ADD COLUMN last_seen INTEGER")
+        cur.execute("UPDATE users SET last_seen = strftime('%s', 'now')")
+    cur.execute("CREATE INDEX IF NOT EXISTS users_last_seen ON users(last_seen)")
+    # Rollups analytiques : une ligne par jour et par jeu / par article
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS stats_games (
+        day TEXT NOT NULL,                           -- YYYY-MM-DD (UTC)
+        game TEXT NOT NULL,
+        wins INTEGER NOT NULL DEFAULT 0,
+        points INTEGER NOT NULL DEFAULT 0,           -- points gagnés (bonus chapeau inclus)
+        PRIMARY KEY (day, game)
+    )
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS stats_items (
+        day TEXT NOT NULL,
+        item TEXT NOT NULL,                          -- clé SHOP
+        purchases INTEGER NOT NULL DEFAULT 0,
+        points_spent INTEGER NOT NULL DEFAULT 0,
+        used INTEGER NOT NULL DEFAULT 0,             -- consommables utilisés
+        PRIMARY KEY (day, item)
+    )
+    """)
+    # Répartition des stades du compagnon, tenue à jour par triggers sur users
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS stats_pets (
+        stage TEXT PRIMARY KEY,
+        users INTEGER NOT NULL DEFAULT 0
+    )
+    """)
+    # Première initialisation sur une base existante : un seul scan de users
+    cur.execute("SELECT COUNT(*) FROM stats_pets")
+    if cur.fetchone()[0] == 0:
+        cur.execute("INSERT INTO stats_pets (stage, users) SELECT pet, COUNT(*) FROM users GROUP BY pet")
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS users_pet_insert AFTER INSERT ON users BEGIN
+        INSERT OR IGNORE INTO stats_pets (stage, users) VALUES (new.pet, 0);
+        UPDATE stats_pets SET users = users + 1 WHERE stage = new.pet;
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS users_pet_update AFTER UPDATE OF pet ON users
+    WHEN old.pet IS NOT new.pet BEGIN
+        INSERT OR IGNORE INTO stats_pets (stage, users) VALUES (new.pet, 0);
+        UPDATE stats_pets SET users = users + 1 WHERE stage = new.pet;
+        UPDATE stats_pets SET users = users - 1 WHERE stage = old.pet;
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS users_pet_delete AFTER DELETE ON users BEGIN
+        UPDATE stats_pets SET users = users - 1 WHERE stage = old.pet;
+    END
+    """)
+    conn.commit()
+    conn.close()
+
+def db_get_user(name: str) -> Optional[Dict]:
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT name, points, consumables, has_hat, inventory_list, achievements, pet, pet_xp
+        FROM users WHERE name=?
+    """, (name,))
+    row = cur.fetchone()
+    if not row and _restore_archived(conn, name):
+        # Profil archivé : on le remet dans la base principale de façon transparente
+        cur.execute("""
+            SELECT name, points, consumables, has_hat, inventory_list, achievements, pet, pet_xp
+            FROM users WHERE name=?
+        """, (name,))
+        row = cur.fetchone()
+    conn.close()
+    if not row:
+        return None
+    try:
+        return {
+            "name": row[0],
+            "points": int(row[1] or 0),
+            "consumables": json.loads(row[2] or "{}"),
+            "has_hat": bool(row[3]),
+            "inventory_list": json.loads(row[4] or "[]"),
+            "achievements": set(json.loads(row[5] or "[]")),
+            "pet": row[6] or "none",
+            "pet_xp": int(row[7] or 0),
+        }
+    except Exception:
+        # Si jamais mauvaise donnée, on revient à un état par défaut
+        return {
+            "name": name,
+            "points": 0,
+            "consumables": {},
+            "has_hat": False,
+            "inventory_list": [],
+            "achievements": set(),
+            "pet": "none",
+            "pet_xp": 0,
+        }
+
+def _record_stats(cur, events):
+    # events : tuples (kind, key, amount) avec kind "win" (jeu, points), "purchase" (article, prix) ou "use" (article, 0)
+    for kind, key, amount in events:
+        if kind == "win":
+            cur.execute("""
+                INSERT INTO stats_games (day, game, wins, points) VALUES (date('now'), ?, 1, ?)
+                ON CONFLICT(day, game) DO UPDATE SET wins=wins+1, points=points+excluded.points
+            """, (key, int(amount)))
+        elif kind == "purchase":
+            cur.execute("""
+                INSERT INTO stats_items (day, item, purchases, points_spent) VALUES (date('now'), ?, 1, ?)
+                ON CONFLICT(day, item) DO UPDATE SET purchases=purchases+1, points_spent=points_spent+excluded.points_spent
+            """, (key, int(amount)))
+        elif kind == "use":
+            cur.execute("""
+                INSERT INTO stats_items (day, item, used) VALUES (date('now'), ?, 1)
+                ON CONFLICT(day, item) DO UPDATE SET used=used+1
+            """, (key,))
+
+def db_upsert_user(state: Dict, events: Iterable[Tuple[str, str, int]] = ()):
+    # state attendu: keys name, points, consumables, has_hat, inventory_list, achievements, pet, pet_xp
+    # events : statistiques à enregistrer dans la même transaction que la sauvegarde
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO users (name, points, consumables, has_hat, inventory_list, achievements, pet, pet_xp, last_seen)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, strftime('%s', 'now'))
+        ON CONFLICT(name) DO UPDATE SET
+            points=excluded.points,
+            consumables=excluded.consumables,
+            has_hat=excluded.has_hat,
+            inventory_list=excluded.inventory_list,
+            achievements=excluded.achievements,
+            pet=excluded.pet,
+            pet_xp=excluded.pet_xp,
+            last_seen=excluded.last_seen
+    """, (
+        state["name"],
+        int(state.get("points", 0)),
+        json.dumps(state.get("consumables", {})),
+        1 if state.get("has_hat", False) else 0,
+        json.dumps(state.get("inventory_list", [])),
+        json.dumps(list(state.get("achievements", []))),
+        state.get("pet", "none"),
+        int(state.get("pet_xp", 0)),
+    ))
+    _record_stats(cur, events)
+    conn.commit()
+    conn.close()
+
+def db_touch_user(name: str, min_interval: int = 3600):
+    # Met à jour last_seen au chargement ; au plus une écriture par min_interval secondes
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE users SET last_seen = strftime('%s', 'now')
+        WHERE name=? AND (last_seen IS NULL OR last_seen < strftime('%s', 'now') - ?)
+    """, (name, min_interval))
+    conn.commit()
+    conn.close()
+
+# =========================
+# Rétention / archive
+# =========================
+def _attach_archive(cur):
+    cur.execute("ATTACH DATABASE ? AS archive", (ARCHIVE_PATH,))
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS archive.users (
+        name TEXT PRIMARY KEY,
+        points INTEGER NOT NULL DEFAULT 0,
+        consumables TEXT NOT NULL DEFAULT '{}',
+        has_hat INTEGER NOT NULL DEFAULT 0,
+        inventory_list TEXT NOT NULL DEFAULT '[]',
+        achievements TEXT NOT NULL DEFAULT '[]',
+        pet TEXT NOT NULL DEFAULT 'none',
+        pet_xp INTEGER NOT NULL DEFAULT 0,
+        last_seen INTEGER,
+        archived_at INTEGER NOT NULL
+    )
+    """)
+
+def _restore_archived(conn, name: str) -> bool:
+    # Ne crée pas le fichier d'archive s'il n'existe pas encore
+    if not os.path.exists(ARCHIVE_PATH):
+        return False
+    cur = conn.cursor()
+    _attach_archive(cur)
+    cur.execute(f"""
+        INSERT OR IGNORE INTO main.users ({USER_COLUMNS})
+        SELECT name, points, consumables, has_hat, inventory_list, achievements, pet, pet_xp, strftime('%s', 'now')
+        FROM archive.users WHERE name=?
+    """, (name,))
+    restored = cur.rowcount > 0
+    if restored:
+        cur.execute("DELETE FROM archive.users WHERE name=?", (name,))
+    conn.commit()
+    cur.execute("DETACH DATABASE archive")
+    return restored
+
+def db_archive_inactive(max_idle_days: int = 90, empty_idle_days: int = 1, batch_size: int = 500) -> int:
+    # Déplace vers l'archive les profils inactifs depuis max_idle_days, ou sans aucune progression
+    # depuis empty_idle_days (pseudos jetables). Une transaction par lot ; renvoie le nombre de profils archivés.
+    conn = get_conn()
+    cur = conn.cursor()
+    _attach_archive(cur)
+    conn.commit()
+    archived = 0
+    while True:
+        cur.execute("""
+            SELECT name FROM main.users
+            WHERE last_seen < strftime('%s', 'now') - ? * 86400
+              AND (last_seen < strftime('%s', 'now') - ? * 86400
+                   OR (points = 0 AND pet = 'none' AND inventory_list = '[]' AND achievements = '[]'))
+            LIMIT ?
+        """, (min(empty_idle_days, max_idle_days), max_idle_days, batch_size))
+        names = [(r[0],) for r in cur.fetchall()]
+        if not names:
+            break
+        cur.executemany(f"""
+            INSERT OR REPLACE INTO archive.users ({USER_COLUMNS}, archived_at)
+            SELECT {USER_COLUMNS}, strftime('%s', 'now') FROM main.users WHERE name=?
+        """, names)
+        cur.executemany("DELETE FROM main.users WHERE name=?", names)
+        conn.commit()
+        archived += len(names)
+        if len(names) < batch_size:
+            break
+    cur.execute("DETACH DATABASE archive")
+    # Rend au système les pages libérées par les suppressions
+    # (executescript : execute() ne fait qu'un pas du pragma, soit une seule page)
+    conn.executescript("PRAGMA main.incremental_vacuum;")
+    conn.close()
+    return archived
+
+# =========================
+# Classement
+# =========================
+def db_top_users(limit: int = 20) -> List[Tuple[str, int]]:
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT name, points FROM users
+        ORDER BY points DESC
+        LIMIT ?
+    """, (limit,))
+    rows = cur.fetchall()
+    conn.close()
+    return rows
+
+def db_user_rank(name: str) -> Optional[Tuple[int, int]]:
+    # Renvoie (points, rang) du joueur, ou None s'il n'existe pas
+    conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("SELECT points FROM users WHERE name=?", (name,))
+    row = cur.fetchone()
+    if not row:
+        conn.close()
+        return None
+    cur.execute("SELECT COUNT(*) + 1 FROM users WHERE points > ?", (row[0],))
+    rank = cur.fetchone()[0]
+    conn.close()
+    return row[0], rank
+
+# =========================
+# Statistiques
+# =========================
+def db_stats(days: int = 30) -> Dict:
+    # Lit uniquement les rollups : le coût dépend du nombre de jours, pas du nombre de joueurs
+    conn = get_conn()
+    cur = conn.cursor()
+    since = f"-{max(days, 1) - 1} days"
+    cur.execute("""
+        SELECT game, SUM(wins), SUM(points) FROM stats_games
+        WHERE day >= date('now', ?) GROUP BY game ORDER BY SUM(wins) DESC
+    """, (since,))
+    games = cur.fetchall()
+    cur.execute("""
+        SELECT item, SUM(purchases), SUM(points_spent), SUM(used) FROM stats_items
+        WHERE day >= date('now', ?) GROUP BY item ORDER BY SUM(purchases) DESC
+    """, (since,))
+    items = cur.fetchall()
+    cur.execute("SELECT stage, users FROM stats_pets ORDER BY users DESC")
+    pets = cur.fetchall()
+    cur.execute("""
+        SELECT day, SUM(wins), SUM(points), SUM(points_spent) FROM (
+            SELECT day, wins, points, 0 AS points_spent FROM stats_games WHERE day >= date('now', ?)
+            UNION ALL
+            SELECT day, 0, 0, points_spent FROM stats_items WHERE day >= date('now', ?)
+        ) GROUP BY day ORDER BY day
+    """, (since, since))
+    per_day = cur.fetchall()
+    conn.close()
+    return {"games": games, "items": items, "pets": pets, "days": per_day}
@@ -0,0 +1,70 @@
+# game_logic.py — Règles des jeux, sans dépendance à Streamlit
+# `state` est un mapping (dict ou st.session_state) avec les mêmes clés que la session.
+from typing import List, Optional, Tuple
+
+COULEURS = ["Rouge","Bleu","Vert","Jaune","Orange","Violet"]
+
+# (stade actuel, XP requise, stade suivant, succès, message)
+PET_STAGES = [
+    ("egg", 10, "puppy", "Naissance du compagnon", "🐣 Ton œuf a éclos en chiot !"),
+    ("puppy", 30, "adult", "Compagnon adulte", "🐶 Ton chiot est devenu adulte !"),
+    ("adult", 100, "legend", "Compagnon légendaire", "👑 Ton compagnon est devenu légendaire !"),
+]
+
+def apply_win(state, points_gain=0) -> int:
+    # Applique un gain (ou une défaite si points_gain == 0) et renvoie le total crédité
+    bonus = 1 if state["has_hat"] else 0
+    total = points_gain + bonus
+    state["points"] += total
+    if points_gain > 0:
+        state["total_wins"] += 1
+        state["consecutive_wins"] += 1
+    else:
+        state["consecutive_wins"] = 0
+    if state["total_wins"] >= 5:
+        state["achievements"].add("Vainqueur x5")
+    if state["consecutive_wins"] >= 3:
+        state["achievements"].add("Série de 3 victoires")
+    if state["pet"] != "none":
+        state["pet_xp"] += points_gain
+    return total
+
+def evolve_pet(state) -> Optional[str]:
+    # Fait évoluer le compagnon d'un stade au plus ; renvoie le message à afficher
+    for stage, xp_min, next_stage, achievement, message in PET_STAGES:
+        if state["pet"] == stage:
+            if state["pet_xp"] >= xp_min:
+                state["pet"] = next_stage
+                state["achievements"].add(achievement)
+                return message
+            return None
+    return None
+
+def check_legend(state) -> bool:
+    # Succès "Légende vivante" (une seule fois) ; renvoie True s'il vient d'être débloqué
+    if (state["pet_xp"] >= 1000) and (not state["legend_awarded"]):
+        state["achievements"].add("🏆 Légende vivante")
+        state["points"] += 20
+        state["legend_awarded"] = True
+        return True
+    return False
+
+def mastermind_score(choix: List[str], secret: List[str]) -> Tuple[int, int]:
+    bien_places = sum([c == s for c, s in zip(choix, secret)])
+    mal_places = sum(min(choix.count(c), secret.count(c)) for c in COULEURS) - bien_places
+    return bien_places, mal_places
+
+def pendu_mask(mot: str, lettres_trouvees: List[str]) -> str:
+    return " ".join([l if l in lettres_trouvees else "_" for l in mot])
+
+def pendu_guess(mot: str, lettres_trouvees: List[str], lettre: str) -> str:
+    # Renvoie "invalide", "deja", "trouvee" (lettre ajoutée) ou "absente"
+    l = (lettre or "").lower()
+    if not l or not l.isalpha():
+        return "invalide"
+    if l in lettres_trouvees:
+        return "deja"
+    if l in mot:
+        lettres_trouvees.append(l)
+        return "trouvee"
+    return "absente"
@@ -0,0 +1,30 @@
+# retention.py — Archive les profils inactifs et réduit la base principale
+#
+#   python retention.py [--jours 90] [--jours-vide 1] [--lot 500]
+#
+# À lancer périodiquement (cron, tâche planifiée). Les profils archivés sont restaurés
+# automatiquement par db_get_user à la prochaine connexion du joueur.
+import argparse
+import os
+import sys
+
+import db
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive les profils inactifs de sauvegarde.db.")
+    parser.add_argument("--jours", type=int, default=90, help="Inactivité (jours) avant archivage")
+    parser.add_argument("--jours-vide", type=int, default=1,
+                        help="Inactivité (jours) avant archivage d'un profil sans aucune progression")
+    parser.add_argument("--lot", type=int, default=500, help="Profils déplacés par transaction")
+    args = parser.parse_args(argv)
+
+    db.db_init()
+    taille_avant = os.path.getsize(db.DB_PATH)
+    archived = db.db_archive_inactive(args.jours, args.jours_vide, args.lot)
+    taille_apres = os.path.getsize(db.DB_PATH)
+    print(f"{archived} profil(s) archivé(s) dans {db.ARCHIVE_PATH}.")
+    print(f"{db.DB_PATH} : {taille_avant // 1024} Ko -> {taille_apres // 1024} Ko")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())